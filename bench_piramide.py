@@ -0,0 +1,209 @@
+"""
+Comprobación y medida de la búsqueda piramidal de main.py.
+
+Compara _buscar_piramide con una búsqueda exhaustiva a resolución completa
+(cv2.matchTemplate en color, score > confidence, primera coincidencia por
+filas, igual que pyautogui) sobre pantallas sintéticas, y mide tiempos en
+el caso habitual de plantilla ausente.
+
+Uso:
+    python bench_piramide.py
+
+Devuelve código de salida 1 si algún resultado difiere de la referencia.
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from main import _buscar_piramide, _preparar_plantilla
+
+ANCHO, ALTO = 1920, 1080
+CONFIANZAS = (0.6, 0.7, 0.8, 0.9)
+
+
+def referencia(pantalla, tpl, confidence):
+    res = cv2.matchTemplate(pantalla, tpl, cv2.TM_CCOEFF_NORMED)
+    aciertos = np.flatnonzero(res > confidence)
+    if aciertos.size == 0:
+        return None
+    y, x = np.unravel_index(aciertos[0], res.shape)
+    return int(x), int(y)
+
+
+# ---------------------------------------------------------
+# PANTALLAS Y PLANTILLAS SINTÉTICAS
+# ---------------------------------------------------------
+
+def texto(rng, alto, ancho):
+    """Bloque con 'letras' oscuras sobre fondo claro."""
+    img = np.full((alto, ancho, 3), 240, np.uint8)
+    x = 2
+    while x < ancho - 6:
+        w = int(rng.integers(3, 7))
+        h = int(rng.integers(alto // 2, alto - 2))
+        img[alto - 2 - h:alto - 2, x:x + w - 1] = int(rng.integers(0, 80))
+        x += w + int(rng.integers(1, 4))
+    return img
+
+
+def dialogo(semilla):
+    """Diálogo tipo SICAL: mismo marco, cambia el texto del cuerpo."""
+    rng = np.random.default_rng(semilla)
+    d = np.full((120, 300, 3), 235, np.uint8)
+    d[:24] = (180, 90, 30)
+    d[0] = d[-1] = 0
+    d[:, 0] = d[:, -1] = 0
+    d[90:112, 200:280] = 210
+    for fila in range(3):
+        d[34 + fila * 16:46 + fila * 16, 12:288] = texto(rng, 12, 276)
+    return d
+
+
+def boton():
+    b = np.full((22, 75, 3), 225, np.uint8)
+    b[0] = b[-1] = 60
+    b[:, 0] = b[:, -1] = 60
+    b[6:16, 12:63] = texto(np.random.default_rng(7), 10, 51)
+    return b
+
+
+def rayas():
+    r = np.zeros((30, 30, 3), np.uint8)
+    r[::2] = 255
+    return r
+
+
+def croma(invertir=False):
+    """Patrón casi solo de color, con una rampa de luminancia débil."""
+    yy, xx = np.mgrid[0:60, 0:60]
+    tablero = ((yy // 10 + xx // 10) % 2).astype(np.float32)
+    rampa = xx.astype(np.float32) / 59.0
+    if invertir:
+        rampa = 1.0 - rampa
+    img = np.empty((60, 60, 3), np.float32)
+    img[..., 2] = 90 + 120 * tablero + 10 * rampa        # R
+    img[..., 1] = 150 - 60 * tablero + 10 * rampa        # G
+    img[..., 0] = 120 + 10 * rampa                       # B
+    return img.astype(np.uint8)
+
+
+def pantalla_ocupada(semilla):
+    """Pantalla tipo escritorio: ventanas, textos, botones y rejillas."""
+    rng = np.random.default_rng(semilla)
+    p = np.full((ALTO, ANCHO, 3), (200, 190, 180), np.uint8)
+    for _ in range(25):
+        x, y = int(rng.integers(0, ANCHO - 400)), int(rng.integers(0, ALTO - 300))
+        w, h = int(rng.integers(200, 400)), int(rng.integers(120, 300))
+        p[y:y + h, x:x + w] = 245
+        p[y:y + 22, x:x + w] = rng.integers(40, 200, 3)
+        for fila in range(y + 30, y + h - 14, 16):
+            p[fila:fila + 12, x + 6:x + w - 6] = texto(rng, 12, w - 12)
+    for fila in range(0, ALTO, 24):
+        p[fila, :] = 160
+    return p
+
+
+def poner(pantalla, img, x, y):
+    h, w = img.shape[:2]
+    pantalla[y:y + h, x:x + w] = img
+
+
+# ---------------------------------------------------------
+# CASOS
+# ---------------------------------------------------------
+
+def casos():
+    rng = np.random.default_rng(1)
+
+    for i in range(10):
+        p = pantalla_ocupada(i)
+        tpl = dialogo(999)
+        poner(p, tpl, int(rng.integers(0, ANCHO - 300)), int(rng.integers(0, ALTO - 120)))
+        yield "dialogo presente", p, tpl
+
+    for i in range(10):
+        yield "dialogo ausente", pantalla_ocupada(100 + i), dialogo(999)
+
+    for i in range(5):
+        p = pantalla_ocupada(200 + i)
+        tpl = dialogo(999)
+        for k in range(int(rng.integers(14, 22))):
+            poner(p, dialogo(k), int(rng.integers(0, ANCHO - 300)), int(rng.integers(0, ALTO - 120)))
+        poner(p, tpl, int(rng.integers(0, ANCHO - 300)), int(rng.integers(0, ALTO - 120)))
+        yield "dialogo entre señuelos", p, tpl
+
+    p = pantalla_ocupada(300)
+    tpl = dialogo(5)
+    senuelo = tpl.copy()
+    senuelo[:24] = (30, 90, 180)
+    for k in range(8):
+        poner(p, senuelo, 100 + k * 30, 50 + k * 120)
+    poner(p, tpl, 1400, 500)
+    yield "señuelos solo de color", p, tpl
+
+    for off in range(8):
+        p = pantalla_ocupada(400 + off)
+        poner(p, boton(), 901 + off, 300 + off)
+        yield "boton presente", p, boton()
+
+    p = pantalla_ocupada(500)
+    for x, y in ((1500, 900), (145, 63), (800, 63)):
+        poner(p, boton(), x, y)
+    yield "botones duplicados", p, boton()
+
+    yield "boton ausente", pantalla_ocupada(501), boton()
+
+    p = pantalla_ocupada(600)
+    poner(p, rayas(), 777, 501)
+    yield "rayas presente", p, rayas()
+
+    p = pantalla_ocupada(700)
+    poner(p, croma(invertir=True), 1011, 333)
+    yield "croma rampa invertida", p, croma()
+
+    yield "croma ausente", pantalla_ocupada(701), croma()
+
+
+def medir(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return sorted(tiempos)[len(tiempos) // 2]
+
+
+def main():
+    fallos = 0
+    t_ref, t_pir = [], []
+    for nombre, pantalla, tpl in casos():
+        plantilla = _preparar_plantilla(tpl)
+        for conf in CONFIANZAS:
+            esperado = referencia(pantalla, tpl, conf)
+            caja = _buscar_piramide(pantalla, plantilla, conf)
+            obtenido = None if caja is None else caja[:2]
+            if obtenido != esperado:
+                fallos += 1
+                print(f"FALLO {nombre} conf={conf}: {obtenido} != {esperado}")
+        if "ausente" in nombre:
+            t_ref.append(medir(lambda: referencia(pantalla, tpl, 0.8)))
+            t_pir.append(medir(lambda: _buscar_piramide(pantalla, plantilla, 0.8)))
+            print(
+                f"{nombre:24s} nivel={plantilla[2]} pérdida={plantilla[3]:.3f} "
+                f"completa={t_ref[-1] * 1000:7.1f} ms  piramidal={t_pir[-1] * 1000:7.1f} ms"
+            )
+
+    print(
+        f"Ausente (mediana): completa={np.median(t_ref) * 1000:.1f} ms  "
+        f"piramidal={np.median(t_pir) * 1000:.1f} ms  "
+        f"(x{np.median(t_ref) / np.median(t_pir):.1f})"
+    )
+    print("OK" if fallos == 0 else f"{fallos} resultados distintos de la referencia")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,13 +16,25 @@ import openpyxl  # para que PyInstaller lo incluya si empaquetas
 
 pyautogui.FAILSAFE = True  # mover ratón a esquina sup. izda aborta
 
-# OpenCV (opcional, para usar 'confidence' en locateOnScreen)
+# OpenCV + numpy (opcionales): búsqueda piramidal con 'confidence'.
+# Sin ellos se usa locateCenterOnScreen con coincidencia exacta.
 try:
-    import cv2  # noqa: F401
+    import cv2
+    import numpy as np
     OPENCV_AVAILABLE = True
 except ImportError:
     OPENCV_AVAILABLE = False
 
+# Búsqueda piramidal (solo con OpenCV): primero se busca en una versión
+# reducida (en color) de pantalla y plantilla, y después se confirma a
+# resolución completa solo en las zonas que han superado el umbral reducido.
+PIRAMIDE_NIVELES = 2            # 2 niveles -> búsqueda gruesa a 1/4
+PIRAMIDE_LADO_MIN = 8           # px mínimos de la plantilla en el nivel reducido
+PIRAMIDE_PERDIDA_MAX = 0.3      # pérdida de score máxima admitida por nivel
+PIRAMIDE_SCORE_MIN = 0.5        # score mínimo del slider '-CONF-'
+PIRAMIDE_PERDIDA_TOL = 0.02     # a igual pérdida (+-tol) se prefiere el nivel más reducido
+PIRAMIDE_FRACCION_MAX = 0.25    # si las zonas a confirmar superan esta fracción
+                                # de la pantalla, se confirma en una sola pasada
 
 # ---------------------------------------------------------
 # RUTAS DE RECURSOS (COMPATIBLE CON PYINSTALLER)
@@ -76,10 +88,237 @@ def write_fast(text: str):
         pyautogui.write(text, interval=0.02)
 
 
+_plantillas_cache: dict = {}
+
+
+def _variantes_plantilla(tpl_color):
+    """
+    Copias alteradas de la plantilla que, a resolución completa, pueden
+    seguir superando el umbral: la propia plantilla, colores permutados,
+    zonas tapadas o con canales cambiados y ruido. Sirven para medir la
+    pérdida de score de la pirámide también en coincidencias imperfectas.
+    """
+    rng = np.random.default_rng(0)
+    alto, ancho = tpl_color.shape[:2]
+    variantes = [tpl_color, tpl_color[:, :, [2, 1, 0]], tpl_color[:, :, [1, 2, 0]]]
+    for k in range(6):
+        v = tpl_color.copy()
+        h, w = int(alto * rng.uniform(0.25, 0.5)), int(ancho * rng.uniform(0.25, 0.5))
+        y, x = int(rng.integers(0, alto - h + 1)), int(rng.integers(0, ancho - w + 1))
+        if k % 2:
+            v[y:y + h, x:x + w] = v[y:y + h, x:x + w, ::-1]
+        else:
+            v[y:y + h, x:x + w] = rng.integers(0, 256, 3)
+        variantes.append(v)
+    for sigma in (25, 50):
+        ruido = rng.normal(0, sigma, tpl_color.shape)
+        variantes.append(np.clip(tpl_color + ruido, 0, 255).astype(np.uint8))
+    return variantes
+
+
+def _perdida_piramide(variantes, tpl_color, tpl_red, nivel: int) -> float:
+    """
+    Mide cuánto score pierde la búsqueda reducida 'nivel' veces frente a la
+    de resolución completa, para cada variante (ver _variantes_plantilla)
+    que a resolución completa supere PIRAMIDE_SCORE_MIN.
+    Prueba todos los desfases respecto a la rejilla reducida y varios
+    entornos (borde replicado, negro, blanco y ruido), porque los píxeles
+    vecinos en pantalla también entran en la reducción.
+    Devuelve la mayor pérdida (1.0 si la plantilla reducida queda plana).
+    """
+    if float(tpl_red.std()) < 1.0:
+        return 1.0
+
+    escala = 2 ** nivel
+    borde = 2 * escala
+    alto, ancho = tpl_color.shape[:2]
+    lado_y, lado_x = alto + 2 * borde + escala, ancho + 2 * borde + escala
+    ruido = np.random.default_rng(1).integers(0, 256, (lado_y, lado_x, 3), dtype=np.uint8)
+    entornos = [np.full((lado_y, lado_x, 3), valor, np.uint8) for valor in (0, 255)]
+    entornos.append(ruido)
+
+    perdida = 0.0
+    for variante in variantes:
+        score = float(cv2.matchTemplate(variante, tpl_color, cv2.TM_CCOEFF_NORMED)[0, 0])
+        if score <= PIRAMIDE_SCORE_MIN:
+            continue
+        for dy in range(escala):
+            for dx in range(escala):
+                y, x = borde + dy, borde + dx
+                lienzos = [
+                    cv2.copyMakeBorder(
+                        variante, y, lado_y - y - alto, x, lado_x - x - ancho,
+                        cv2.BORDER_REPLICATE,
+                    )
+                ]
+                for entorno in entornos:
+                    lienzo = entorno.copy()
+                    lienzo[y:y + alto, x:x + ancho] = variante
+                    lienzos.append(lienzo)
+
+                for lienzo in lienzos:
+                    for _ in range(nivel):
+                        lienzo = cv2.pyrDown(lienzo)
+                    res = cv2.matchTemplate(lienzo, tpl_red, cv2.TM_CCOEFF_NORMED)
+                    # Solo cuentan los picos reducidos cuya zona de
+                    # confirmación (un píxel reducido alrededor) cubre (y, x)
+                    cy, cx = y // escala, x // escala
+                    cerca = res[max(0, cy - 1):cy + 2, max(0, cx - 1):cx + 2]
+                    perdida = max(perdida, score - float(cerca.max()))
+    return perdida
+
+
+def _preparar_plantilla(tpl_color):
+    """
+    Prepara una plantilla BGR para _buscar_piramide.
+    Elige el nivel de pirámide con menor pérdida de score medida (el más
+    selectivo, porque el umbral reducido es confidence - pérdida); a igual
+    pérdida, el más reducido. Si ningún nivel pierde <= PIRAMIDE_PERDIDA_MAX,
+    nivel 0 (búsqueda a resolución completa).
+    Devuelve (color, plantilla_reducida, nivel, perdida).
+    """
+    piramide = [tpl_color]
+    while len(piramide) <= PIRAMIDE_NIVELES:
+        alto, ancho = piramide[-1].shape[:2]
+        if min(alto, ancho) // 2 < PIRAMIDE_LADO_MIN:
+            break
+        piramide.append(cv2.pyrDown(piramide[-1]))
+
+    variantes = _variantes_plantilla(tpl_color)
+    plantilla = (tpl_color, tpl_color, 0, 0.0)
+    for nivel in range(len(piramide) - 1, 0, -1):
+        perdida = _perdida_piramide(variantes, tpl_color, piramide[nivel], nivel)
+        if perdida > PIRAMIDE_PERDIDA_MAX:
+            continue
+        if plantilla[2] == 0 or perdida < plantilla[3] - PIRAMIDE_PERDIDA_TOL:
+            plantilla = (tpl_color, piramide[nivel], nivel, perdida)
+    return plantilla
+
+
+def _cargar_plantilla(ruta_imagen: str):
+    """
+    Carga y prepara una plantilla, cacheada por ruta (se recarga si el
+    fichero cambia). Devuelve lo mismo que _preparar_plantilla o None.
+    """
+    mtime = os.path.getmtime(ruta_imagen)
+    cacheada = _plantillas_cache.get(ruta_imagen)
+    if cacheada and cacheada[0] == mtime:
+        return cacheada[1]
+
+    color = cv2.imread(ruta_imagen, cv2.IMREAD_COLOR)
+    if color is None:
+        return None
+
+    plantilla = _preparar_plantilla(color)
+    _plantillas_cache[ruta_imagen] = (mtime, plantilla)
+    return plantilla
+
+
+def _primera_coincidencia(zona, tpl_color, confidence: float, x0: int = 0, y0: int = 0):
+    """
+    Coincidencia a resolución completa y en color dentro de 'zona', con el
+    mismo criterio que pyautogui con 'confidence': score > confidence y la
+    primera por filas. Devuelve (y, x) en coordenadas de pantalla o None.
+    """
+    alto, ancho = tpl_color.shape[:2]
+    if zona.shape[0] < alto or zona.shape[1] < ancho:
+        return None
+
+    res = cv2.matchTemplate(zona, tpl_color, cv2.TM_CCOEFF_NORMED)
+    if cv2.minMaxLoc(res)[1] <= confidence:
+        return None
+    aciertos = np.flatnonzero(res > confidence)
+    if aciertos.size == 0:
+        return None
+    dy, dx = np.unravel_index(aciertos[0], res.shape)
+    return int(y0 + dy), int(x0 + dx)
+
+
+def _buscar_piramide(pantalla, plantilla, confidence: float):
+    """
+    Busca 'plantilla' (ver _preparar_plantilla) en 'pantalla' (BGR):
+    - Búsqueda gruesa en color al nivel elegido, con umbral
+      confidence - pérdida medida de la plantilla.
+    - Las posiciones que lo superan se agrupan en zonas y se confirman a
+      resolución completa (una pasada por zona, o una sola pasada sobre
+      toda la pantalla si las zonas ocupan más de PIRAMIDE_FRACCION_MAX).
+    Devuelve la primera coincidencia por filas, como pyautogui, en forma
+    de rectángulo (izq, arriba, ancho, alto), o None.
+    """
+    tpl_color, tpl_red, nivel, perdida = plantilla
+    alto, ancho = tpl_color.shape[:2]
+    pant_alto, pant_ancho = pantalla.shape[:2]
+    if alto > pant_alto or ancho > pant_ancho:
+        return None
+
+    if nivel == 0:
+        zonas = [(0, 0, pant_ancho, pant_alto)]
+    else:
+        escala = 2 ** nivel
+        pant_red = pantalla
+        for _ in range(nivel):
+            pant_red = cv2.pyrDown(pant_red)
+        t_alto, t_ancho = tpl_red.shape[:2]
+        if t_alto > pant_red.shape[0] or t_ancho > pant_red.shape[1]:
+            return None
+
+        res = cv2.matchTemplate(pant_red, tpl_red, cv2.TM_CCOEFF_NORMED)
+        mascara = (res >= confidence - perdida).astype(np.uint8)
+        if not mascara.any():
+            return None
+
+        # Cada posición reducida cubre 'escala' píxeles, más el desplazamiento
+        # que introduce pyrDown; se dilata un píxel reducido por cada lado.
+        mascara = cv2.dilate(mascara, np.ones((3, 3), np.uint8))
+        n, _, stats, _ = cv2.connectedComponentsWithStats(mascara)
+        zonas = []
+        area = 0
+        for bx, by, bw, bh, _ in stats[1:n]:
+            x0, y0 = max(0, bx * escala), max(0, by * escala)
+            x1 = min(pant_ancho - ancho + 1, (bx + bw) * escala)
+            y1 = min(pant_alto - alto + 1, (by + bh) * escala)
+            zonas.append((x0, y0, x1, y1))
+            area += (x1 - x0) * (y1 - y0)
+        if area > PIRAMIDE_FRACCION_MAX * pant_ancho * pant_alto:
+            zonas = [(0, 0, pant_ancho, pant_alto)]
+
+    primera = None
+    for x0, y0, x1, y1 in zonas:
+        # (x0,y0)-(x1,y1): posiciones de la esquina sup. izda. a comprobar
+        zona = pantalla[y0:y1 + alto - 1, x0:x1 + ancho - 1]
+        encontrada = _primera_coincidencia(zona, tpl_color, confidence, x0, y0)
+        if encontrada and (primera is None or encontrada < primera):
+            primera = encontrada
+
+    if primera is None:
+        return None
+    arriba, izq = primera
+    return izq, arriba, ancho, alto
+
+
+def _localizar_piramide(ruta_imagen: str, confidence: float):
+    """
+    Localiza una imagen en pantalla con búsqueda piramidal, con el mismo
+    criterio que pyautogui con 'confidence' (color, TM_CCOEFF_NORMED,
+    score > confidence, primera coincidencia por filas).
+    Devuelve el centro (x,y) o None.
+    """
+    plantilla = _cargar_plantilla(ruta_imagen)
+    if plantilla is None:
+        return None
+
+    pantalla = cv2.cvtColor(np.array(pyautogui.screenshot()), cv2.COLOR_RGB2BGR)
+    caja = _buscar_piramide(pantalla, plantilla, confidence)
+    if caja is None:
+        return None
+    izq, arriba, ancho, alto = caja
+    return pyautogui.Point(izq + ancho // 2, arriba + alto // 2)
+
+
 def localizar_en_pantalla(ruta_imagen: str, confidence: float):
     """
     Busca una imagen en pantalla.
-    - Si hay OpenCV, usa 'confidence'.
+    - Si hay OpenCV, búsqueda piramidal con 'confidence'.
     - Si no, coincidencia exacta sin 'confidence'.
     Devuelve el centro (x,y) o None.
     """
@@ -87,7 +326,7 @@ def localizar_en_pantalla(ruta_imagen: str, confidence: float):
         return None
 
     if OPENCV_AVAILABLE:
-        loc = pyautogui.locateCenterOnScreen(ruta_imagen, confidence=confidence)
+        loc = _localizar_piramide(ruta_imagen, confidence)
     else:
         loc = pyautogui.locateCenterOnScreen(ruta_imagen)
 